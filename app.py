@@ -1,66 +1,213 @@
+# Concurrency model: plain sync Flask on threads, not asyncio/ASGI.
+# SQLite calls are short and CPU-local, so async wrappers such as aiosqlite
+# only add a thread hop per query. Run production with a threaded WSGI
+# server (PREFERRED_PROD_SERVER below): WAL lets the pooled reader
+# connections run alongside the single locked writer, and each worker
+# process opens its own pool at import time.
+import hashlib
+import math
 import os
+import queue
 import sqlite3
-from flask import Flask, render_template, request, jsonify
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from flask import Flask, render_template, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
 
 app = Flask(__name__)
 app.config["DATABASE"] = os.path.join(os.path.dirname(os.path.abspath(__file__)), "shopping_list.db")
-
-
-def get_db():
-    conn = sqlite3.connect(app.config["DATABASE"])
+app.config["DB_POOL_SIZE"] = 8
+app.config["PREFERRED_PROD_SERVER"] = "gunicorn -w 2 -k gthread --threads 8 app:app"
+
+_PRAGMAS = """
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+    PRAGMA busy_timeout = 30000;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA cache_size = -20000;
+"""
+
+SQL_LISTS = "SELECT id, name, slug FROM shopping_list ORDER BY id"
+SQL_LIST_INSERT = "INSERT INTO shopping_list (name, slug) VALUES (?, ?) RETURNING id, name, slug"
+SQL_LIST_ID = "SELECT id FROM shopping_list WHERE slug = ?"
+SQL_CATEGORIES = "SELECT id, name FROM category ORDER BY name"
+SQL_LIST_VERSION = "SELECT version FROM list_version WHERE list_id = ?"
+SQL_LIST_ITEMS = """SELECT id, list_id, category_id, name, quantity, notes,
+                           price, checked, sort_order,
+                           (SELECT COALESCE(SUM(price), 0) FROM item
+                            WHERE list_id = ?1 AND (?2 IS NULL OR checked = ?2)) AS total,
+                           (SELECT COUNT(*) FROM item
+                            WHERE list_id = ?1 AND (?2 IS NULL OR checked = ?2)) AS total_count
+                    FROM item
+                    WHERE list_id = ?1 AND (?2 IS NULL OR checked = ?2)
+                    ORDER BY sort_order, id
+                    LIMIT ?3 OFFSET ?4"""
+SQL_LIST_ITEMS_TOTALS = """SELECT COALESCE(SUM(price), 0), COUNT(*)
+                           FROM item
+                           WHERE list_id = ?1 AND (?2 IS NULL OR checked = ?2)"""
+SQL_ITEM_INSERT = """INSERT INTO item (list_id, category_id, name, quantity, notes, price, checked, sort_order)
+                     SELECT ?, ?, ?, ?, ?, ?, 0, COALESCE(MAX(sort_order), -1) + 1
+                     FROM item WHERE list_id = ?
+                     RETURNING id, list_id, category_id, name, quantity, notes, price, checked, sort_order"""
+SQL_ITEM_BULK_START = """SELECT (SELECT COALESCE(MAX(sort_order), -1) + 1 FROM item WHERE list_id = ?),
+                                (SELECT COALESCE(MAX(id), 0) FROM item)"""
+SQL_ITEM_BULK_INSERT = """INSERT INTO item (list_id, category_id, name, quantity, notes, price, checked, sort_order)
+                          VALUES (?, ?, ?, ?, ?, ?, 0, ?)"""
+SQL_ITEMS_SINCE = """SELECT id, list_id, category_id, name, quantity, notes, price, checked, sort_order
+                     FROM item WHERE list_id = ? AND id > ? ORDER BY id"""
+SQL_ITEM = "SELECT id, list_id, category_id, name, quantity, notes, price, checked, sort_order FROM item WHERE id = ?"
+SQL_ITEM_DELETE = "DELETE FROM item WHERE id = ?"
+SQL_CLEAR_COMPLETED = "DELETE FROM item WHERE list_id = ? AND checked = 1 RETURNING id"
+
+_MAX_PAGE_ARG = 1_000_000
+_MAX_BULK_ITEMS = 500
+_CHECKED_ARGS = {"1": 1, "true": 1, "0": 0, "false": 0}
+
+_SLUG_TBL = str.maketrans({" ": "-", "'": None})
+
+_pool = None
+_writer = None
+_writer_lock = threading.Lock()
+
+_CAT = {}
+
+
+def _connect(read_only=False):
+    conn = sqlite3.connect(
+        app.config["DATABASE"], isolation_level=None, check_same_thread=False
+    )
     conn.row_factory = sqlite3.Row
+    conn.executescript(_PRAGMAS)
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
     return conn
 
 
-def init_db():
-    conn = get_db()
-    conn.executescript("""
-        CREATE TABLE IF NOT EXISTS shopping_list (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            slug TEXT NOT NULL UNIQUE
-        );
-        CREATE TABLE IF NOT EXISTS category (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL
-        );
-        CREATE TABLE IF NOT EXISTS item (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            list_id INTEGER NOT NULL,
-            category_id INTEGER NOT NULL,
-            name TEXT NOT NULL,
-            quantity TEXT,
-            notes TEXT,
-            price REAL,
-            checked INTEGER NOT NULL DEFAULT 0,
-            sort_order INTEGER NOT NULL DEFAULT 0,
-            FOREIGN KEY (list_id) REFERENCES shopping_list(id),
-            FOREIGN KEY (category_id) REFERENCES category(id)
-        );
-    """)
-    cursor = conn.execute("SELECT COUNT(*) FROM category")
-    if cursor.fetchone()[0] == 0:
-        for name in ("Produce", "Dairy", "Bakery", "Frozen", "Other"):
-            conn.execute("INSERT INTO category (name) VALUES (?)", (name,))
-    cursor = conn.execute("SELECT COUNT(*) FROM shopping_list")
-    if cursor.fetchone()[0] == 0:
-        conn.execute(
-            "INSERT INTO shopping_list (name, slug) VALUES (?, ?)",
-            ("Saturday", "saturday"),
-        )
-    conn.commit()
-    conn.close()
+def open_pool():
+    global _pool, _writer
+    _writer = _connect()
+    _pool = queue.Queue(maxsize=app.config["DB_POOL_SIZE"])
+    for _ in range(app.config["DB_POOL_SIZE"]):
+        _pool.put(_connect(read_only=True))
+
+
+def _null_nonfinite(obj):
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _null_nonfinite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_null_nonfinite(v) for v in obj]
+    return obj
 
 
-_db_initialized = False
+def _dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj)
+    # Match orjson, which writes NaN/Infinity as null instead of invalid JSON.
+    try:
+        return json.dumps(obj, separators=(",", ":"), allow_nan=False).encode()
+    except ValueError:
+        return json.dumps(_null_nonfinite(obj), separators=(",", ":")).encode()
+
+
+def _json(obj):
+    return app.response_class(_dumps(obj), mimetype="application/json")
+
+
+@contextmanager
+def borrow(write=False):
+    if write:
+        with _writer_lock:
+            yield _writer
+        return
+    conn = _pool.get()
+    try:
+        yield conn
+    finally:
+        _pool.put(conn)
 
 
-@app.before_request
-def ensure_db():
-    global _db_initialized
-    if not _db_initialized:
-        init_db()
-        _db_initialized = True
+def init_db():
+    open_pool()
+    with borrow(write=True) as conn:
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS shopping_list (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                slug TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS category (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS item (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                list_id INTEGER NOT NULL,
+                category_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                quantity TEXT,
+                notes TEXT,
+                price REAL,
+                checked INTEGER NOT NULL DEFAULT 0,
+                sort_order INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (list_id) REFERENCES shopping_list(id),
+                FOREIGN KEY (category_id) REFERENCES category(id)
+            );
+            CREATE INDEX IF NOT EXISTS ix_item_list_sort ON item(list_id, sort_order, id);
+            CREATE INDEX IF NOT EXISTS ix_item_list_checked ON item(list_id, checked);
+            CREATE TABLE IF NOT EXISTS list_version (
+                list_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TRIGGER IF NOT EXISTS trg_item_insert AFTER INSERT ON item BEGIN
+                INSERT INTO list_version (list_id, version) VALUES (NEW.list_id, 1)
+                ON CONFLICT (list_id) DO UPDATE SET version = version + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_item_update AFTER UPDATE ON item BEGIN
+                INSERT INTO list_version (list_id, version) VALUES (NEW.list_id, 1)
+                ON CONFLICT (list_id) DO UPDATE SET version = version + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_item_delete AFTER DELETE ON item BEGIN
+                INSERT INTO list_version (list_id, version) VALUES (OLD.list_id, 1)
+                ON CONFLICT (list_id) DO UPDATE SET version = version + 1;
+            END;
+        """)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute("SELECT COUNT(*) FROM category")
+            if cursor.fetchone()[0] == 0:
+                conn.executemany(
+                    "INSERT INTO category (name) VALUES (?)",
+                    [(name,) for name in ("Produce", "Dairy", "Bakery", "Frozen", "Other")],
+                )
+            cursor = conn.execute("SELECT COUNT(*) FROM shopping_list")
+            if cursor.fetchone()[0] == 0:
+                conn.execute(
+                    "INSERT INTO shopping_list (name, slug) VALUES (?, ?)",
+                    ("Saturday", "saturday"),
+                )
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        cursor = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            conn.execute("ANALYZE")
+        _cat_load(conn)
+
+
+def _cat_load(conn):
+    rows = conn.execute("SELECT id, name FROM category").fetchall()
+    _CAT.clear()
+    _CAT.update((r["id"], r["name"]) for r in rows)
 
 
 @app.route("/")
@@ -73,12 +220,9 @@ def index():
 
 @app.route("/api/lists", methods=["GET"])
 def api_lists_get():
-    conn = get_db()
-    rows = conn.execute(
-        "SELECT id, name, slug FROM shopping_list ORDER BY id"
-    ).fetchall()
-    conn.close()
-    return jsonify([{"id": r["id"], "name": r["name"], "slug": r["slug"]} for r in rows])
+    with borrow() as conn:
+        rows = conn.execute(SQL_LISTS).fetchall()
+    return _json([{"id": r["id"], "name": r["name"], "slug": r["slug"]} for r in rows])
 
 
 @app.route("/api/lists", methods=["POST"])
@@ -86,25 +230,14 @@ def api_lists_post():
     data = request.get_json() or {}
     name = (data.get("name") or "").strip()
     if not name:
-        return jsonify({"error": "name is required"}), 400
-    slug = name.lower().replace(" ", "-").replace("'", "")
-    if not slug:
-        slug = "list"
-    conn = get_db()
-    try:
-        conn.execute(
-            "INSERT INTO shopping_list (name, slug) VALUES (?, ?)",
-            (name, slug),
-        )
-        conn.commit()
-        row = conn.execute(
-            "SELECT id, name, slug FROM shopping_list WHERE id = last_insert_rowid()"
-        ).fetchone()
-        conn.close()
-        return jsonify({"id": row["id"], "name": row["name"], "slug": row["slug"]}), 201
-    except sqlite3.IntegrityError:
-        conn.close()
-        return jsonify({"error": "list with that name/slug already exists"}), 409
+        return _json({"error": "name is required"}), 400
+    slug = name.lower().translate(_SLUG_TBL) or "list"
+    with borrow(write=True) as conn:
+        try:
+            row = conn.execute(SQL_LIST_INSERT, (name, slug)).fetchone()
+        except sqlite3.IntegrityError:
+            return _json({"error": "list with that name/slug already exists"}), 409
+    return _json({"id": row["id"], "name": row["name"], "slug": row["slug"]}), 201
 
 
 # --- Category API ---
@@ -112,73 +245,136 @@ def api_lists_post():
 
 @app.route("/api/categories", methods=["GET"])
 def api_categories_get():
-    conn = get_db()
-    rows = conn.execute("SELECT id, name FROM category ORDER BY name").fetchall()
-    conn.close()
-    return jsonify([{"id": r["id"], "name": r["name"]} for r in rows])
+    with borrow() as conn:
+        rows = conn.execute(SQL_CATEGORIES).fetchall()
+    resp = _json([{"id": r["id"], "name": r["name"]} for r in rows])
+    resp.add_etag()
+    return resp.make_conditional(request)
 
 
 # --- Item API ---
 
 
-def _list_id_from_slug(slug):
-    conn = get_db()
-    row = conn.execute("SELECT id FROM shopping_list WHERE slug = ?", (slug,)).fetchone()
-    conn.close()
+def _slug_id_uncached(slug):
+    with borrow() as conn:
+        row = conn.execute(SQL_LIST_ID, (slug,)).fetchone()
     return row["id"] if row else None
 
 
-@app.route("/api/lists/<slug>/items", methods=["GET"])
-def api_list_items_get(slug):
-    list_id = _list_id_from_slug(slug)
+@lru_cache(maxsize=1024)
+def _cached_list_id(slug):
+    # Raise on a miss so lru_cache does not remember it: the slug may be
+    # created later, possibly by another worker process.
+    list_id = _slug_id_uncached(slug)
     if list_id is None:
-        return jsonify({"error": "list not found"}), 404
-    conn = get_db()
-    total_row = conn.execute(
-        "SELECT COALESCE(SUM(price), 0) AS total FROM item WHERE list_id = ?",
-        (list_id,),
-    ).fetchone()
-    total_spend = float(total_row["total"])
-    rows = conn.execute(
-        """SELECT i.id, i.list_id, i.category_id, i.name, i.quantity, i.notes,
-                  i.price, i.checked, i.sort_order, c.name AS category_name
-           FROM item i
-           JOIN category c ON c.id = i.category_id
-           WHERE i.list_id = ?
-           ORDER BY i.sort_order, i.id""",
-        (list_id,),
-    ).fetchall()
-    conn.close()
-    items = [
-        {
-            "id": r["id"],
-            "list_id": r["list_id"],
-            "category_id": r["category_id"],
-            "category_name": r["category_name"],
-            "name": r["name"],
-            "quantity": r["quantity"] or "",
-            "notes": r["notes"] or "",
-            "price": float(r["price"]) if r["price"] is not None else None,
-            "checked": bool(r["checked"]),
-            "sort_order": r["sort_order"],
-        }
-        for r in rows
-    ]
-    return jsonify({"items": items, "total_spend": round(total_spend, 2)})
+        raise KeyError(slug)
+    return list_id
 
 
-@app.route("/api/lists/<slug>/items", methods=["POST"])
-def api_list_items_post(slug):
+def _list_id_from_slug(slug):
+    try:
+        return _cached_list_id(slug)
+    except KeyError:
+        return None
+
+
+def _list_etag(list_id, query_string):
+    with borrow() as conn:
+        row = conn.execute(SQL_LIST_VERSION, (list_id,)).fetchone()
+    version = row["version"] if row else 0
+    key = b"%d:%d:" % (list_id, version) + query_string
+    return hashlib.blake2b(key, digest_size=8).hexdigest()
+
+
+def _fetch_items(list_id, checked=None, limit=-1, offset=0):
+    total_spend = 0.0
+    total_count = 0
+    with borrow() as conn:
+        cur = conn.cursor()
+        cur.row_factory = None
+        rows = cur.execute(SQL_LIST_ITEMS, (list_id, checked, limit, offset)).fetchall()
+        if rows:
+            total_spend, total_count = rows[0][-2:]
+        elif offset > 0 or limit == 0:
+            total_spend, total_count = conn.execute(SQL_LIST_ITEMS_TOTALS, (list_id, checked)).fetchone()
+    return rows, total_spend, total_count
+
+
+def _stream_items(rows, total_spend, total_count):
+    yield b'{"items":['
+    sep = b""
+    for id_, list_id_, cat_id, name, qty, notes, price, checked_, so, _, _ in rows:
+        yield sep + _dumps(
+            {
+                "id": id_,
+                "list_id": list_id_,
+                "category_id": cat_id,
+                "category_name": _CAT.get(cat_id, ""),
+                "name": name,
+                "quantity": qty or "",
+                "notes": notes or "",
+                "price": float(price) if price is not None else None,
+                "checked": bool(checked_),
+                "sort_order": so,
+            }
+        )
+        sep = b","
+    yield (
+        b'],"total_spend":' + _dumps(round(float(total_spend), 2))
+        + b',"total_count":' + _dumps(total_count) + b"}"
+    )
+
+
+@app.route("/api/lists/<slug>/items", methods=["GET"])
+def api_list_items_get(slug):
     list_id = _list_id_from_slug(slug)
     if list_id is None:
-        return jsonify({"error": "list not found"}), 404
-    data = request.get_json() or {}
+        return _json({"error": "list not found"}), 404
+    limit = request.args.get("limit", type=int)
+    if limit is None or limit < 0:
+        limit = -1
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    if limit > _MAX_PAGE_ARG or offset > _MAX_PAGE_ARG:
+        return _json({"error": f"limit and offset must be at most {_MAX_PAGE_ARG}"}), 400
+    checked = request.args.get("checked")
+    if checked is not None:
+        checked = _CHECKED_ARGS.get(checked.lower())
+        if checked is None:
+            return _json({"error": "checked must be one of 1, true, 0, false"}), 400
+    etag = _list_etag(list_id, request.query_string)
+    if request.if_none_match.contains_weak(etag):
+        resp = app.response_class(status=304)
+    else:
+        rows, total_spend, total_count = _fetch_items(list_id, checked, limit, offset)
+        resp = app.response_class(
+            _stream_items(rows, total_spend, total_count), mimetype="application/json"
+        )
+    resp.set_etag(etag)
+    return resp
+
+
+def _item_dict(row):
+    return {
+        "id": row["id"],
+        "list_id": row["list_id"],
+        "category_id": row["category_id"],
+        "category_name": _CAT.get(row["category_id"], ""),
+        "name": row["name"],
+        "quantity": row["quantity"] or "",
+        "notes": row["notes"] or "",
+        "price": float(row["price"]) if row["price"] is not None else None,
+        "checked": bool(row["checked"]),
+        "sort_order": row["sort_order"],
+    }
+
+
+def _parse_item(data):
     name = (data.get("name") or "").strip()
     if not name:
-        return jsonify({"error": "name is required"}), 400
+        return None, "name is required"
     category_id = data.get("category_id")
     if category_id is None:
-        return jsonify({"error": "category_id is required"}), 400
+        return None, "category_id is required"
     quantity = (data.get("quantity") or "").strip()
     notes = (data.get("notes") or "").strip()
     price = data.get("price")
@@ -189,123 +385,121 @@ def api_list_items_post(slug):
                 price = None
         except (TypeError, ValueError):
             price = None
-    conn = get_db()
-    max_order = conn.execute(
-        "SELECT COALESCE(MAX(sort_order), -1) + 1 AS next FROM item WHERE list_id = ?",
-        (list_id,),
-    ).fetchone()
-    sort_order = max_order["next"]
-    conn.execute(
-        """INSERT INTO item (list_id, category_id, name, quantity, notes, price, checked, sort_order)
-           VALUES (?, ?, ?, ?, ?, ?, 0, ?)""",
-        (list_id, category_id, name, quantity or None, notes or None, price, sort_order),
-    )
-    conn.commit()
-    row = conn.execute(
-        "SELECT i.id, i.category_id, i.name, i.quantity, i.notes, i.price, i.checked, i.sort_order, c.name AS category_name "
-        "FROM item i JOIN category c ON c.id = i.category_id WHERE i.id = last_insert_rowid()"
-    ).fetchone()
-    conn.close()
-    return (
-        jsonify(
-            {
-                "id": row["id"],
-                "list_id": list_id,
-                "category_id": row["category_id"],
-                "category_name": row["category_name"],
-                "name": row["name"],
-                "quantity": row["quantity"] or "",
-                "notes": row["notes"] or "",
-                "price": float(row["price"]) if row["price"] is not None else None,
-                "checked": False,
-                "sort_order": row["sort_order"],
-            }
-        ),
-        201,
-    )
+    return (category_id, name, quantity or None, notes or None, price), None
+
+
+@app.route("/api/lists/<slug>/items", methods=["POST"])
+def api_list_items_post(slug):
+    list_id = _list_id_from_slug(slug)
+    if list_id is None:
+        return _json({"error": "list not found"}), 404
+    item, error = _parse_item(request.get_json() or {})
+    if error:
+        return _json({"error": error}), 400
+    with borrow(write=True) as conn:
+        row = conn.execute(SQL_ITEM_INSERT, (list_id, *item, list_id)).fetchone()
+    return _json(_item_dict(row)), 201
+
+
+@app.route("/api/lists/<slug>/items/bulk", methods=["POST"])
+def api_list_items_bulk_post(slug):
+    list_id = _list_id_from_slug(slug)
+    if list_id is None:
+        return _json({"error": "list not found"}), 404
+    data = request.get_json()
+    if not isinstance(data, list) or not data:
+        return _json({"error": "a non-empty list of items is required"}), 400
+    if len(data) > _MAX_BULK_ITEMS:
+        return _json({"error": f"at most {_MAX_BULK_ITEMS} items per request"}), 413
+    items = []
+    for n, entry in enumerate(data):
+        item, error = _parse_item(entry if isinstance(entry, dict) else {})
+        if error:
+            return _json({"error": f"item {n}: {error}"}), 400
+        items.append(item)
+    with borrow(write=True) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            next_order, last_id = conn.execute(SQL_ITEM_BULK_START, (list_id,)).fetchone()
+            conn.executemany(
+                SQL_ITEM_BULK_INSERT,
+                [(list_id, *item, next_order + n) for n, item in enumerate(items)],
+            )
+            rows = conn.execute(SQL_ITEMS_SINCE, (list_id, last_id)).fetchall()
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    return _json([_item_dict(r) for r in rows]), 201
+
+
+def _patch_price(val, row):
+    if val is None:
+        return None
+    try:
+        return float(val) if float(val) >= 0 else None
+    except (TypeError, ValueError):
+        return row["price"]
+
+
+_PATCH = {
+    "name": ("name", lambda v, r: (v or "").strip() or r["name"]),
+    "quantity": ("quantity", lambda v, r: (v or "").strip() if v is not None else r["quantity"]),
+    "notes": ("notes", lambda v, r: (v or "").strip() if v is not None else r["notes"]),
+    "category_id": ("category_id", lambda v, r: v),
+    "price": ("price", _patch_price),
+    "checked": ("checked", lambda v, r: 1 if v else 0),
+}
 
 
 @app.route("/api/items/<int:item_id>", methods=["PATCH"])
 def api_item_patch(item_id):
     data = request.get_json() or {}
-    conn = get_db()
-    row = conn.execute("SELECT id, list_id, category_id, name, quantity, notes, price, checked, sort_order FROM item WHERE id = ?", (item_id,)).fetchone()
-    if not row:
-        conn.close()
-        return jsonify({"error": "item not found"}), 404
-    updates = []
-    params = []
-    for key in ("name", "quantity", "notes", "category_id"):
-        if key in data:
-            val = data[key]
-            if key == "name":
-                val = (val or "").strip() or row["name"]
-            elif key in ("quantity", "notes"):
-                val = (val or "").strip() if val is not None else row[key]
-            updates.append(f"{key} = ?")
-            params.append(val)
-    if "price" in data:
-        p = data["price"]
-        if p is None:
-            params.append(None)
-        else:
-            try:
-                params.append(float(p) if float(p) >= 0 else None)
-            except (TypeError, ValueError):
-                params.append(row["price"])
-        updates.append("price = ?")
-    if "checked" in data:
-        updates.append("checked = ?")
-        params.append(1 if data["checked"] else 0)
-    if not updates:
-        conn.close()
-        return jsonify({"error": "no fields to update"}), 400
-    params.append(item_id)
-    conn.execute(f"UPDATE item SET {', '.join(updates)} WHERE id = ?", params)
-    conn.commit()
-    row = conn.execute(
-        "SELECT i.id, i.list_id, i.category_id, i.name, i.quantity, i.notes, i.price, i.checked, i.sort_order, c.name AS category_name "
-        "FROM item i JOIN category c ON c.id = i.category_id WHERE i.id = ?",
-        (item_id,),
-    ).fetchone()
-    conn.close()
-    return jsonify(
-        {
-            "id": row["id"],
-            "list_id": row["list_id"],
-            "category_id": row["category_id"],
-            "category_name": row["category_name"],
-            "name": row["name"],
-            "quantity": row["quantity"] or "",
-            "notes": row["notes"] or "",
-            "price": float(row["price"]) if row["price"] is not None else None,
-            "checked": bool(row["checked"]),
-            "sort_order": row["sort_order"],
-        }
-    )
+    with borrow(write=True) as conn:
+        row = conn.execute(SQL_ITEM, (item_id,)).fetchone()
+        if not row:
+            return _json({"error": "item not found"}), 404
+        if not isinstance(data, dict):
+            return _json({"error": "no fields to update"}), 400
+        updates = []
+        params = []
+        for key, val in data.items():
+            spec = _PATCH.get(key)
+            if spec:
+                col, norm = spec
+                updates.append(f"{col} = ?")
+                params.append(norm(val, row))
+        if not updates:
+            return _json({"error": "no fields to update"}), 400
+        params.append(item_id)
+        row = conn.execute(
+            f"UPDATE item SET {', '.join(updates)} WHERE id = ? "
+            "RETURNING id, list_id, category_id, name, quantity, notes, price, checked, sort_order",
+            params,
+        ).fetchone()
+    return _json(_item_dict(row))
 
 
 @app.route("/api/items/<int:item_id>", methods=["DELETE"])
 def api_item_delete(item_id):
-    conn = get_db()
-    cur = conn.execute("DELETE FROM item WHERE id = ?", (item_id,))
-    conn.commit()
-    conn.close()
+    with borrow(write=True) as conn:
+        cur = conn.execute(SQL_ITEM_DELETE, (item_id,))
     if cur.rowcount == 0:
-        return jsonify({"error": "item not found"}), 404
-    return jsonify({"ok": True}), 200
+        return _json({"error": "item not found"}), 404
+    return _json({"ok": True}), 200
 
 
 @app.route("/api/lists/<slug>/items/clear-completed", methods=["POST"])
 def api_list_clear_completed(slug):
     list_id = _list_id_from_slug(slug)
     if list_id is None:
-        return jsonify({"error": "list not found"}), 404
-    conn = get_db()
-    conn.execute("DELETE FROM item WHERE list_id = ? AND checked = 1", (list_id,))
-    conn.commit()
-    conn.close()
-    return jsonify({"ok": True}), 200
+        return _json({"error": "list not found"}), 404
+    with borrow(write=True) as conn:
+        ids = [r[0] for r in conn.execute(SQL_CLEAR_COMPLETED, (list_id,))]
+    return _json({"ok": True, "deleted": ids}), 200
+
+
+init_db()
 
 
 if __name__ == "__main__":